@@ -64,11 +64,9 @@ if True:
 def make_circuit(bdr, x, params):
     bdr.allin(x[[0,1]])
 
-    bdr.cz(0, 1)
-    bdr.allin(params[[0,1]])
+    bdr.cz_allin(0, 1, params[[0,1]])
 
-    bdr.cz(0, 1)
-    bdr.allin(params[[2,3]])
+    bdr.cz_allin(0, 1, params[[2,3]])
 
     return bdr
 
@@ -124,6 +124,36 @@ class circuitBuilder():
         """
         raise NotImplementedError
 
+    def cz_allin(self, a, b, theta):
+        """Add CZ gate between qubits `a` and `b`, followed by input gates on
+        `a` and `b`. Equivalent to ``cz(a, b).input([a, b], theta)``, but
+        builders may apply it as a single two-qubit gate.
+
+        Parameters
+        ----------
+        a : int
+            Control qubit
+        b : int
+            Target qubit.
+        theta : list-like
+            Parameters to input on `a` and `b`.
+
+        Returns
+        -------
+        circuitBuilder
+            self
+
+        Raises
+        ------
+        ValueError
+            If a or b are out of range, or if they are equal
+        TypeError
+            If the indices are not int
+        """
+        if a == b:
+            raise ValueError(f"cz_allin needs two distinct qubits, got {a}")
+        return self.cz(a, b).input([a, b], theta)
+
     def fsim(self, a, b, theta, phi):
         """Add fSIM gate between qubits `a` and `b`
 
@@ -1,6 +1,6 @@
 """Implementation of circuit for ML
 """
-from numpy import pi, random, zeros_like, zeros, log2
+from numpy import pi, random, zeros_like, zeros, log2, stack, float64
 
 
 class circuitML():
@@ -28,7 +28,11 @@ class circuitML():
         Number of qubits.
     nbparams : int
         Number of parameters.
+    rdtype : numpy.dtype
+        Real precision of the circuit simulation, by default float64.
     """
+    rdtype = float64
+
     def __init__(self, make_circuit, nbqbits, nbparams, cbuilder):
         self.nbqbits = nbqbits
         self.nbparams = nbparams
@@ -66,6 +70,34 @@ class circuitML():
         """
         raise NotImplementedError
 
+    def run_multiparams(self, X, params, nbshots=None, job_size=None):
+        """Run the circuit with input `X` for each parameter vector in
+        `params`.
+
+        Backends able to simulate several parameter vectors at once override
+        this method, by default it calls :meth:`run` once per vector.
+
+        Parameters
+        ----------
+        X : array-like
+            Input matrix of shape *(nb_samples, nb_features)*.
+        params : array-like
+            Parameter matrix of shape *(nb_vectors, nb_params)*.
+        nbshots : int, optional
+            Number of shots for the circuit run, by default ``None``. If
+            ``None``, uses the backend default.
+        job_size : int, optional
+            Maximum job size, to split the circuit runs, by default ``None``.
+            If ``None``, put all *nb_samples* in the same job.
+
+        Returns
+        -------
+        array
+            Bitstring counts as an array of shape *(nb_vectors, nb_samples,
+            2**nbqbits)*
+        """
+        return stack([self.run(X, p, nbshots, job_size) for p in params])
+
     def random_params(self, seed=None):
         """Generate a valid vector of random parameters.
 
@@ -1,17 +1,42 @@
 """Circuit builders for the manyQ simulator"""
 from ..circuitBuilder import circuitBuilder
 
+import numpy as np
 import manyq as mq
 
+from .mqKernels import init_register, SXRZSX, SXRZSX_multi, CZ, CZ_SXRZSX
+
 
 class mqBuilder(circuitBuilder):
     """Builder for circuits to be run on manyQ simulator.
+
+    Parameters
+    ----------
+    nbqbits : int
+        Number of qubits.
+    batch_size : int
+        Number of circuits simulated in parallel.
+    gpu : bool, optional
+        Whether to run on gpu, by default False.
+    dtype : numpy.dtype, optional
+        Complex type of the simulated quantum state, by default
+        ``np.complex128``.
+    trace : bool, optional
+        Whether to record the textual description of the gates, returned by
+        ``str``, by default True.
+
+    Notes
+    -----
+    Qubit indices are verified only when Python runs without the ``-O``
+    flag, like assertions.
     """
-    def __init__(self, nbqbits, batch_size, *args, gpu=False, **kwargs):
+    def __init__(self, nbqbits, batch_size, *args, gpu=False,
+                 dtype=np.complex128, trace=True, **kwargs):
         super().__init__(nbqbits)
-        mq.initQreg(nbqbits, batch_size, gpu=gpu)
+        init_register(nbqbits, batch_size, gpu=gpu, dtype=dtype)
 
-        self.__txt = ""
+        self.__trace = trace
+        self.__txt = []
 
     def __run_circuit__(self, nbshots=None):
         if not nbshots:
@@ -23,7 +48,7 @@ class mqBuilder(circuitBuilder):
         return self.__run_circuit__(nbshots)
 
     def __str__(self):
-        return self.__txt
+        return "".join(self.__txt)
 
     def __repr__(self):
         return "mqBuilder(" + str(self) + ")"
@@ -43,50 +68,83 @@ class mqBuilder(circuitBuilder):
     def measure_all(self):
         mq.measureAll()
 
-        self.__txt += "measure_all()"
+        if self.__trace:
+            self.__txt.append("measure_all()")
 
         return self
 
     def __single_input(self, idx, theta):
-        self.__verify_index__(idx)
-        mq.SX(idx)
-        mq.RZ(idx, theta)
-        mq.SX(idx)
+        if __debug__:
+            self.__verify_index__(idx)
+        SXRZSX(idx, theta)
+
+        if self.__trace:
+            self.__txt.append(f"SX({idx})RZ({idx},{theta})SX({idx})")
 
-        self.__txt += f"SX({idx})RZ({idx},{theta})SX({idx})"
+    def __multi_input(self, idx, theta):
+        # Extra angles are ignored, as in the other builders
+        SXRZSX_multi(idx, theta[:len(idx)])
+
+        if self.__trace:
+            self.__txt.extend(
+                f"SX({i})RZ({i},{theta[p]})SX({i})" for p, i in enumerate(idx)
+            )
 
     def input(self, idx, theta):
         if isinstance(idx, list):
-            for p, i in enumerate(idx):
-                self.__single_input(i, theta[p])
+            if __debug__:
+                for i in idx:
+                    self.__verify_index__(i)
+            self.__multi_input(idx, theta)
         else:
             self.__single_input(idx, theta)
 
         return self
 
     def allin(self, theta):
-        for i in range(self.nbqbits):
-            self.__single_input(i, theta[i])
+        self.__multi_input(list(range(self.nbqbits)), theta)
 
         return self
 
     def cz(self, a, b):
-        self.__verify_index__(a)
-        self.__verify_index__(b)
+        if __debug__:
+            self.__verify_index__(a)
+            self.__verify_index__(b)
+
+        CZ(a, b)
+
+        if self.__trace:
+            self.__txt.append(f"CZ({a},{b})")
+
+        return self
+
+    def cz_allin(self, a, b, theta):
+        if __debug__:
+            self.__verify_index__(a)
+            self.__verify_index__(b)
+        # The fused gate would overwrite amplitudes of a single qubit
+        if a == b:
+            raise ValueError(f"cz_allin needs two distinct qubits, got {a}")
 
-        mq.CZ(a, b)
+        CZ_SXRZSX(a, b, theta)
 
-        self.__txt += f"CZ({a},{b})"
+        if self.__trace:
+            self.__txt.append(f"CZ({a},{b})")
+            self.__txt.extend(
+                f"SX({i})RZ({i},{t})SX({i})" for i, t in zip((a, b), theta)
+            )
 
         return self
 
 
     def fsim(self, a, b, theta, phi):
-        self.__verify_index__(a)
-        self.__verify_index__(b)
+        if __debug__:
+            self.__verify_index__(a)
+            self.__verify_index__(b)
 
         mq.fSIM(a, b, theta, phi)
 
-        self.__txt += f"fSIM({a},{b})"
+        if self.__trace:
+            self.__txt.append(f"fSIM({a},{b})")
 
         return self
@@ -7,12 +7,19 @@ import numpy as np
 # TODO: verify import
 __gpu_available__ = True
 try:
-    from cupy import asarray, hstack
+    from cupy import asarray, asnumpy
 except ModuleNotFoundError:
     __gpu_available__ = False
 
 from .mqBuilder import mqBuilder
 
+# Memory budget for the two state buffers of a cpu run, in bytes. By default,
+# larger batches are split so that each chunk stays in cache, unless chunks
+# would hold less than MIN_CHUNK_SIZE samples: each chunk builds its circuit
+# in Python, which then costs more than the cache misses.
+STATE_CACHE_BYTES = 2**21
+MIN_CHUNK_SIZE = 256
+
 
 class mqCircuitML(circuitML):
     """Quantum ML circuit interface for manyq simulator.
@@ -28,8 +35,14 @@ class mqCircuitML(circuitML):
         Number of qubits.
     nbparams : int
         Number of parameters.
+    gpu : bool, optional
+        Whether to run on gpu, by default False.
     cbuilder : circuitBuilder, optional
         Circuit builder, by default mqBuilder
+    dtype : numpy.dtype, optional
+        Complex type of the simulated quantum state, by default
+        ``np.complex128``. Using ``np.complex64`` halves the memory traffic,
+        at the cost of a larger finite difference step when fitting.
 
     Attributes
     ----------
@@ -37,6 +50,8 @@ class mqCircuitML(circuitML):
         Number of qubits.
     nbparams : int
         Number of parameters.
+    rdtype : numpy.dtype
+        Real type matching the state precision.
 
     Raises
     ------
@@ -44,7 +59,8 @@ class mqCircuitML(circuitML):
         If both `noise_model` and `noise_backend` are provided.
     """
     def __init__(
-        self, make_circuit, nbqbits, nbparams, gpu=False, cbuilder=mqBuilder
+        self, make_circuit, nbqbits, nbparams, gpu=False, cbuilder=mqBuilder,
+        dtype=np.complex128
     ):
         super().__init__(make_circuit, nbqbits, nbparams, cbuilder)
         if gpu and not __gpu_available__:
@@ -52,6 +68,9 @@ class mqCircuitML(circuitML):
                 "No module named 'cupy', install for gpu support."
             )
         self.__gpu = gpu
+        self.__dtype = np.dtype(dtype)
+        # Inputs and parameters are cast to the state precision
+        self.rdtype = np.finfo(self.__dtype).dtype
 
     def __verify_builder__(self, cbuilder):
         bdr = cbuilder(1, 1)
@@ -62,33 +81,81 @@ class mqCircuitML(circuitML):
             )
 
     def __single_run__(self, X, params, nbshots=None):
+        """Run the circuits on the batch `X`. If `params` is a matrix, its rows
+        are the parameters of the corresponding row of `X`.
+        """
         batch_size = 1 if len(X.shape) < 2 else len(X)
 
-        _X = X.T
-        _params = None
+        # Each row of _X is a feature over the batch, so we make it contiguous
+        _X = np.ascontiguousarray(X.T, dtype=self.rdtype)
+        _params = np.asarray(params, dtype=self.rdtype)
+        if _params.ndim > 1:
+            _params = np.ascontiguousarray(_params.T)
+        else:
+            # Shared parameters are a single column, broadcast over the batch,
+            # so that the gates depending only on them are computed once.
+            _params = _params.reshape(-1, 1)
         if self.__gpu:
             _X = asarray(_X)
-            _params = hstack(batch_size * (asarray(params).reshape(-1, 1),))
-        else:
-            _params = np.hstack(batch_size * (params.reshape(-1, 1),))
+            _params = asarray(_params)
 
         bdr = self.make_circuit(
             self._circuitBuilder(
-                self.nbqbits, batch_size=batch_size, gpu=self.__gpu
+                self.nbqbits, batch_size=batch_size, gpu=self.__gpu,
+                dtype=self.__dtype, trace=False
             ),
             _X, _params
         )
         if nbshots: bdr.measure_all()
 
         result = bdr.circuit()(nbshots)
+        if self.__gpu:
+            # Results go back to host memory, as expected by the Classifier
+            result = asnumpy(result)
 
         return result.T if batch_size > 1 else result.ravel()
 
+    def __chunked_run__(self, X, params, nbshots=None, job_size=None):
+        """Run the circuits on `X` by chunks of at most `job_size` samples.
+        """
+        if job_size is None and not self.__gpu:
+            chunk_size = STATE_CACHE_BYTES // (
+                2 * 2**self.nbqbits * self.__dtype.itemsize
+            )
+            if chunk_size >= MIN_CHUNK_SIZE:
+                job_size = chunk_size
+        if job_size is None or len(X.shape) < 2 or len(X) <= job_size:
+            return self.__single_run__(X, params, nbshots)
+
+        params = np.asarray(params)
+        out = []
+        for start in range(0, len(X), job_size):
+            chunk = slice(start, start + job_size)
+            _params = params[chunk] if params.ndim > 1 else params
+            out.append(
+                self.__single_run__(X[chunk], _params, nbshots)
+                .reshape(len(X[chunk]), -1)
+            )
+
+        return np.concatenate(out)
+
     def run(self, X, params, nbshots=None, job_size=None):
-        if job_size:
-            raise NotImplementedError
+        return self.__chunked_run__(X, params, nbshots, job_size)
+
+    def run_multiparams(self, X, params, nbshots=None, job_size=None):
+        X = np.asarray(X)
+        if len(X.shape) < 2:
+            X = X.reshape(1, -1)
+        nbvect, nbsamples = len(params), len(X)
+
+        # All the parameter vectors are simulated in the same batch
+        result = self.__chunked_run__(
+            np.tile(X, (nbvect, 1)),
+            np.repeat(np.asarray(params), nbsamples, axis=0),
+            nbshots, job_size
+        )
 
-        return self.__single_run__(X, params, nbshots)
+        return result.reshape(nbvect, nbsamples, -1)
 
     def gpu(self):
         """Switch to cupy.
@@ -0,0 +1,293 @@
+"""Vectorized gate kernels acting directly on the manyQ register.
+
+They complement the single-qubit gates of manyQ by fusing gates and applying
+them to several qubits at once, on the whole batch. When numba is installed,
+the kernels are compiled and update the state in place.
+"""
+import numpy as np
+import manyq as mq
+
+try:
+    import cupy
+except ModuleNotFoundError:
+    cupy = None
+
+__numba_available__ = True
+try:
+    from numba import njit
+except ModuleNotFoundError:
+    __numba_available__ = False
+
+
+def _xp():
+    """Array module of the register: cupy if it is on gpu, else numpy."""
+    return cupy if mq.Qreg.gpu else np
+
+
+def _swap():
+    mq.Qreg.inQ, mq.Qreg.outQ = mq.Qreg.outQ, mq.Qreg.inQ
+
+
+# Flat state buffers reused across registers, see init_register
+_pool = None
+
+
+def init_register(nbqbits, batch_size, gpu=False, dtype=np.complex128):
+    """Set all qubits of the manyQ register to ket0, as ``manyq.initQreg``.
+
+    The state buffers are views on a pool that is only reallocated when it is
+    too small, so that alternating between batch sizes, as done by fit for
+    the loss and its gradient, does not allocate a new state at each run.
+
+    Parameters
+    ----------
+    nbqbits : int
+        Number of qubits.
+    batch_size : int
+        Number of circuits simulated in parallel.
+    gpu : bool, optional
+        Whether to run on gpu, by default False.
+    dtype : numpy.dtype, optional
+        Complex type of the state, by default ``np.complex128``.
+    """
+    global _pool
+    size = 2**nbqbits * batch_size
+
+    if mq.Qreg.gpu != gpu:
+        # manyq switches its array module only in initQreg
+        mq.initQreg(nbqbits, batch_size, gpu=gpu)
+        _pool = None
+    xp = _xp()
+    if _pool is None or _pool[0].size < size or _pool[0].dtype != dtype:
+        _pool = (xp.empty(size, dtype=dtype), xp.empty(size, dtype=dtype))
+
+    mq.Qreg.nbqubits = nbqbits
+    mq.Qreg.n = batch_size
+    mq.Qreg.inQ = _pool[0][:size].reshape(2**nbqbits, batch_size)
+    mq.Qreg.outQ = _pool[1][:size].reshape(2**nbqbits, batch_size)
+    mq.Qreg.inQ.fill(0)
+    mq.Qreg.inQ[0] = 1
+
+
+def _bit(qbit):
+    """Mask of `qbit` in the basis state index."""
+    return 1 << (mq.Qreg.nbqubits - 1 - qbit)
+
+
+def _half_angles(thetas):
+    """Half of each angle in `thetas`, broadcast to an array of shape
+    *(len(thetas), 1)* or *(len(thetas), batch_size)*.
+    """
+    xp = _xp()
+    rdtype = mq.Qreg.inQ.real.dtype
+    return .5 * xp.stack(xp.broadcast_arrays(
+        *(xp.asarray(t, dtype=rdtype).reshape(-1) for t in thetas)
+    ))
+
+
+def _sxrzsx_numpy(qbit, sin, cos):
+    shape = (2**qbit, 2, -1, mq.Qreg.n)
+    inQ = mq.Qreg.inQ.reshape(shape)
+    outQ = mq.Qreg.outQ.reshape(shape)
+
+    outQ[:, 0] = sin * inQ[:, 0] + cos * inQ[:, 1]
+    outQ[:, 1] = cos * inQ[:, 0] - sin * inQ[:, 1]
+    _swap()
+
+
+def _cz_numpy(a, b):
+    qbit0, qbit1 = min(a, b), max(a, b)
+    shape = (2**qbit0, 2, 2**(qbit1 - qbit0 - 1), 2, -1, mq.Qreg.n)
+    mq.Qreg.inQ.reshape(shape)[:, 1, :, 1] *= -1
+
+
+if __numba_available__:
+    @njit(cache=True, fastmath=True)
+    def _sxrzsx_kernel(state, masks, sin, cos):
+        for q in range(len(masks)):
+            mask = masks[q]
+            for j in range(state.shape[0]):
+                if j & mask:
+                    continue
+                j1 = j | mask
+                for z in range(state.shape[1]):
+                    a = state[j, z]
+                    b = state[j1, z]
+                    state[j, z] = sin[q, z] * a + cos[q, z] * b
+                    state[j1, z] = cos[q, z] * a - sin[q, z] * b
+
+    @njit(cache=True, fastmath=True)
+    def _cz_kernel(state, mask):
+        for j in range(state.shape[0]):
+            if j & mask == mask:
+                for z in range(state.shape[1]):
+                    state[j, z] = -state[j, z]
+
+    @njit(cache=True, fastmath=True)
+    def _apply_2q_kernel(state, mask_a, mask_b, gate):
+        idx = np.empty(4, dtype=np.int64)
+        amp = np.empty(4, dtype=state.dtype)
+        for j in range(state.shape[0]):
+            if j & (mask_a | mask_b):
+                continue
+            idx[0], idx[1] = j, j | mask_b
+            idx[2], idx[3] = j | mask_a, j | mask_a | mask_b
+            for z in range(state.shape[1]):
+                g = z if gate.shape[2] > 1 else 0
+                for k in range(4):
+                    amp[k] = state[idx[k], z]
+                for k in range(4):
+                    state[idx[k], z] = (
+                        gate[k, 0, g] * amp[0] + gate[k, 1, g] * amp[1]
+                        + gate[k, 2, g] * amp[2] + gate[k, 3, g] * amp[3]
+                    )
+
+    @njit(cache=True, fastmath=True)
+    def _cz_sxrzsx_kernel(state, mask_a, mask_b, sin_a, cos_a, sin_b, cos_b):
+        for j in range(state.shape[0]):
+            if j & (mask_a | mask_b):
+                continue
+            j01, j10, j11 = j | mask_b, j | mask_a, j | mask_a | mask_b
+            for z in range(state.shape[1]):
+                v00, v01 = state[j, z], state[j01, z]
+                v10, v11 = state[j10, z], -state[j11, z]
+                # Input gate on a
+                w00 = sin_a[z] * v00 + cos_a[z] * v10
+                w10 = cos_a[z] * v00 - sin_a[z] * v10
+                w01 = sin_a[z] * v01 + cos_a[z] * v11
+                w11 = cos_a[z] * v01 - sin_a[z] * v11
+                # Input gate on b
+                state[j, z] = sin_b[z] * w00 + cos_b[z] * w01
+                state[j01, z] = cos_b[z] * w00 - sin_b[z] * w01
+                state[j10, z] = sin_b[z] * w10 + cos_b[z] * w11
+                state[j11, z] = cos_b[z] * w10 - sin_b[z] * w11
+
+
+def SXRZSX(qbit, theta):
+    """Apply the input gate SX RZ(theta) SX on `qbit`.
+
+    The three gates multiply to the real matrix
+    ``[[sin(theta/2), cos(theta/2)], [cos(theta/2), -sin(theta/2)]]``, which
+    is applied in a single pass over the state.
+
+    Parameters
+    ----------
+    qbit : int
+        Qubit index.
+    theta : Union[float, vector]
+        Angle, or vector of angles over the batch.
+    """
+    SXRZSX_multi([qbit], [theta])
+
+
+def SXRZSX_multi(qbits, thetas):
+    """Apply the input gate of :func:`SXRZSX` on each qubit of `qbits`, in
+    order.
+
+    Parameters
+    ----------
+    qbits : list[int]
+        Qubit indices.
+    thetas : list-like
+        Angles for each qubit, each one either a float or a vector over the
+        batch.
+    """
+    if len(thetas) != len(qbits):
+        raise ValueError(
+            f"Got {len(thetas)} angles for {len(qbits)} qubits"
+        )
+
+    xp = _xp()
+    half = _half_angles(thetas)
+    sin, cos = xp.sin(half), xp.cos(half)
+
+    if __numba_available__ and not mq.Qreg.gpu:
+        shape = (len(qbits), mq.Qreg.n)
+        _sxrzsx_kernel(
+            mq.Qreg.inQ, np.array([_bit(q) for q in qbits]),
+            np.ascontiguousarray(np.broadcast_to(sin, shape)),
+            np.ascontiguousarray(np.broadcast_to(cos, shape)),
+        )
+    else:
+        for q, _sin, _cos in zip(qbits, sin, cos):
+            _sxrzsx_numpy(q, _sin, _cos)
+
+
+def CZ(a, b):
+    """Apply CZ gate between qubits `a` and `b`, in place."""
+    if __numba_available__ and not mq.Qreg.gpu:
+        _cz_kernel(mq.Qreg.inQ, _bit(a) | _bit(b))
+    else:
+        _cz_numpy(a, b)
+
+
+def apply_2q(a, b, gate):
+    """Apply a two-qubit gate on qubits `a` and `b`.
+
+    Parameters
+    ----------
+    a : int
+        First qubit, most significant in the gate basis.
+    b : int
+        Second qubit.
+    gate : array
+        Gate of shape *(4, 4)*, or *(4, 4, batch_size)* for a different gate
+        on each circuit of the batch.
+    """
+    if __numba_available__ and not mq.Qreg.gpu:
+        gate = np.asarray(gate, dtype=mq.Qreg.inQ.dtype).reshape((4, 4, -1))
+        _apply_2q_kernel(
+            mq.Qreg.inQ, _bit(a), _bit(b), np.ascontiguousarray(gate)
+        )
+        return
+
+    xp = _xp()
+    gate = xp.asarray(gate).reshape((2, 2, 2, 2, -1))
+    if a > b:
+        a, b = b, a
+        gate = gate.transpose(1, 0, 3, 2, 4)
+
+    shape = (2**a, 2, 2**(b - a - 1), 2, -1, mq.Qreg.n)
+    # cupy.einsum has no out argument
+    mq.Qreg.outQ.reshape(shape)[...] = xp.einsum(
+        'ijklz,xkylwz->xiyjwz', gate, mq.Qreg.inQ.reshape(shape)
+    )
+    _swap()
+
+
+def CZ_SXRZSX(a, b, theta):
+    """Apply CZ between `a` and `b`, followed by the input gates of
+    :func:`SXRZSX` on `a` and `b`, as a single two-qubit gate.
+
+    Parameters
+    ----------
+    a : int
+        First qubit.
+    b : int
+        Second qubit.
+    theta : list-like
+        Angles for `a` and `b`, each one either a float or a vector over the
+        batch. Extra angles are ignored.
+    """
+    xp = _xp()
+    half = _half_angles((theta[0], theta[1]))[:, None]
+    sin, cos = xp.sin(half), xp.cos(half)
+
+    if __numba_available__ and not mq.Qreg.gpu:
+        shape = (2, mq.Qreg.n)
+        sin = np.ascontiguousarray(np.broadcast_to(sin[:, 0], shape))
+        cos = np.ascontiguousarray(np.broadcast_to(cos[:, 0], shape))
+        _cz_sxrzsx_kernel(
+            mq.Qreg.inQ, _bit(a), _bit(b), sin[0], cos[0], sin[1], cos[1]
+        )
+        return
+
+    # Input gates of shape (2, 2, 2, batch), one for each qubit
+    inputs = xp.stack((xp.concatenate((sin, cos), 1),
+                       xp.concatenate((cos, -sin), 1)), 1)
+
+    # CZ only flips the sign of |11>, so it multiplies the last column
+    gate = xp.einsum('ikz,jlz->ijklz', inputs[0], inputs[1])
+    gate[:, :, 1, 1] *= -1
+
+    apply_2q(a, b, gate.astype(mq.Qreg.inQ.dtype))
@@ -17,6 +17,10 @@ SCIPY_METHODS = {
     'newton-cg', 'l-bfgs-b', 'tnc', 'cobyla',
     'slsqp', 'trust-constr', 'dogleg',
 }
+# Methods using the gradient, which we estimate by finite differences
+SCIPY_GRADIENT_METHODS = {
+    'bfgs', 'cg', 'newton-cg', 'l-bfgs-b', 'tnc', 'slsqp', 'trust-constr',
+}
 
 
 class Classifier():
@@ -57,7 +61,8 @@ class Classifier():
         Name to identify this classifier.
     save_path : str, optional
         Where to save intermediate training results, by deafult None. If
-        ``None``, intermediate results are not saved.
+        ``None``, intermediate results are not saved. Results are saved every
+        10 iterations of a fit with ``save_loss_progress``.
 
     Attributes
     ----------
@@ -126,6 +131,7 @@ class Classifier():
 
         self.__last_loss_value__ = None
         self.__last_output__ = None
+        self.__last_indices__ = None
         self.__last_params__ = None
         self.__loss_progress__ = []
         self.__output_progress__ = []
@@ -217,6 +223,9 @@ class Classifier():
         else:
             raise TypeError("Bitstrings must be either int or binary strings")
 
+        # Index array to gather the bitstrings columns from the circuit output
+        self._bitstr_idx = np.asarray(self.bitstr, dtype=np.intp)
+
     def __set_nbshots_increment__(self, nbshots_increment):
         __incr__ = nbshots_increment
         if nbshots_increment is None:
@@ -236,6 +245,8 @@ class Classifier():
                     return nbshots
 
         self.nbshots_increment = __incr__
+        # Without increment, fit does not need to call it
+        self._no_shot_increment = nbshots_increment is None
 
     def run_circuit(self, X, params=None):
         """Run the circuit with input `X` and parameters `params`.
@@ -262,7 +273,7 @@ class Classifier():
             X, params, self.nbshots, job_size=self.job_size
         )
 
-    def predict_proba(self, X, params=None):
+    def predict_proba(self, X, params=None, out=None):
         """Compute the bitstring probabilities associated to each input point
         of the design matrix.
 
@@ -273,6 +284,9 @@ class Classifier():
         params : vector, optional
             Circuit parameters, by default None. If not given, model
             parameters are used.
+        out : array, optional
+            Array of shape *(n, len(bitstr))* in which to store the result,
+            by default None.
 
         Returns
         -------
@@ -281,12 +295,22 @@ class Classifier():
             columns to bitstrings, whose order is defined in
             :attr:`~polyadicqml.quantumClassifier.bitstr`.
         """
-        out = self.run_circuit(X, params)
+        counts = self.run_circuit(X, params)
+
+        if out is None:
+            out = counts[:, self._bitstr_idx]
+            if self.nbshots:
+                out = out / float(self.nbshots)
+            return out
 
+        if counts.dtype == out.dtype:
+            np.take(counts, self._bitstr_idx, axis=1, out=out)
+        else:
+            out[...] = counts[:, self._bitstr_idx]
         if self.nbshots:
-            out = out / float(self.nbshots)
+            out /= float(self.nbshots)
 
-        return out[:, self.bitstr]
+        return out
 
     def proba_to_label(self, proba) -> np.ndarray:
         """Transforms a matrix of real values in integer labels.
@@ -370,16 +394,25 @@ class Classifier():
         if loss or output:
             self.__loss_progress__.append(self.__last_loss_value__)
         if output:
-            self.__output_progress__.append(self.__last_output__.tolist())
+            # Outputs are stored in the order of the training samples
+            _order = np.argsort(self.__last_indices__)
+            self.__output_progress__.append(
+                self.__last_output__[_order].tolist()
+            )
             self.__params_progress__.append(params.tolist())
 
-        if self.__save_path__ and self.__n_iter__ % 10 == 0:
+        if self.__save_path__ and loss and self.__n_iter__ % 10 == 0:
             self.save()
 
-        # We randomize the indices only after the callback
-        # this is necessary to estimate the gradient by FD
-        self._rnd_indices = np.random.choice(
-            self.__indices, size=self.__batch_size, replace=False)
+    def __draw_batch__(self):
+        """Draw the indices of the training minibatch.
+        """
+        if self.__batch_size < self.__nbsamples:
+            self.__rnd_indices = self.__rng.choice(
+                self.__nbsamples, size=self.__batch_size, replace=False
+            )
+        else:
+            self.__rnd_indices = np.arange(self.__nbsamples)
 
     def __scipy_minimize__(
             self, input_train, target_train, labels, method,
@@ -387,23 +420,42 @@ class Classifier():
             **kwargs
     ):
 
+        # Reused at each evaluation, as the minibatch size does not change
+        probas_buffer = np.empty((self.__batch_size, len(self.bitstr)))
+        # Best parameters are copied here, as some optimizers (e.g.
+        # Nelder-Mead) pass views of arrays they later overwrite.
+        best_params = np.array(self.params, dtype=float)
+        # Last point evaluated by to_optimize, reused by the gradient
+        last_params = np.full_like(best_params, np.nan)
+        last_indices, last_loss = None, None
+
         def to_optimize(params):
-            self.nbshots = self.nbshots_increment(
-                self.nbshots, self.__n_iter__, self.__min_loss__)
+            nonlocal last_indices, last_loss
+            if not self._no_shot_increment:
+                self.nbshots = self.nbshots_increment(
+                    self.nbshots, self.__n_iter__, self.__min_loss__)
 
             probas = self.predict_proba(
-                input_train[self.__rnd_indices], params
+                input_train[self.__rnd_indices], params, out=probas_buffer
             )
             loss_value = self.__loss__(
                 target_train[self.__rnd_indices], probas, labels=labels
             )
 
-            self.__last_loss_value__ = loss_value
-            self.__last_output__ = probas[np.argsort(self.__rnd_indices)]
+            np.copyto(last_params, params)
+            last_indices, last_loss = self.__rnd_indices, loss_value
+
+            if save_loss_progress or save_output_progress:
+                self.__last_loss_value__ = loss_value
+            if save_output_progress:
+                # The buffer is copied by the callback, when storing it
+                self.__last_output__ = probas
+                self.__last_indices__ = self.__rnd_indices
 
             if loss_value < self.__min_loss__:
                 self.__min_loss__ = loss_value
-                self.set_params(params.copy())
+                np.copyto(best_params, params)
+                self.set_params(best_params)
 
             if method.lower() == "cobyla":
                 self.__callback__(
@@ -414,6 +466,38 @@ class Classifier():
 
         # SCIPY.MINIMIZE IMPLEMENTATION
         options = kwargs.get('options', {'maxiter': self.__budget__})
+        # The default step follows the precision of the circuit simulation
+        eps = options.get(
+            'eps', np.sqrt(np.finfo(self.circuit.rdtype).eps)
+        )
+
+        def gradient(params):
+            # Forward finite differences, where all the perturbed parameter
+            # vectors are run in the same circuit batch. The loss at `params`
+            # is usually the last one computed by to_optimize.
+            reuse = (last_indices is self.__rnd_indices
+                     and np.array_equal(params, last_params))
+            _params = params + eps * np.eye(len(params))
+            if not reuse:
+                _params = np.vstack((params, _params))
+            out = self.circuit.run_multiparams(
+                input_train[self.__rnd_indices], _params, self.nbshots,
+                job_size=self.job_size
+            )
+            self.nfev += len(_params)
+            out = out[:, :, self._bitstr_idx]
+            if self.nbshots:
+                out = out / float(self.nbshots)
+
+            _target = target_train[self.__rnd_indices]
+            loss_values = np.array([
+                self.__loss__(_target, probas, labels=labels)
+                for probas in out
+            ])
+            if reuse:
+                return (loss_values - last_loss) / eps
+            return (loss_values[1:] - loss_values[0]) / eps
+
         bounds = kwargs.get('bounds')
         if method == 'L-BFGS-B' and bounds is None:
             bounds = [(-np.pi, np.pi) for _ in self.params]
@@ -422,6 +506,8 @@ class Classifier():
             method=method, bounds=bounds,
             options=options,
         )
+        if method.lower() in SCIPY_GRADIENT_METHODS:
+            mini_kwargs["jac"] = gradient
         if method.lower() not in ('cobyla'):
             mini_kwargs["callback"] = lambda xk: self.__callback__(
                 xk, save_loss_progress, save_output_progress,
@@ -429,7 +515,8 @@ class Classifier():
 
         mini_out = minimize(to_optimize, self.params, **mini_kwargs)
 
-        self.set_params(mini_out.x.copy())
+        # The result array is freshly allocated by scipy
+        self.set_params(mini_out.x)
         self.__fit_conv__ = mini_out.success
 
     def __inner_opt__(self):
@@ -446,8 +533,10 @@ class Classifier():
         target_train : vector
             Labels corresponding to `input_train`.
         batch_size : int, optional
-            Minibatches size, by default None. If none uses the full dataset
-            with rndom shuffle at each iteration.
+            Minibatches size, by default None. If none uses the full dataset.
+            The minibatch is drawn at random once per fit, and kept during the
+            whole optimization, as the optimizers compare loss values across
+            iterations.
         method : str, optional
             Optimization method, by default BFGS
         bounds : sequence, optional
@@ -455,7 +544,9 @@ class Classifier():
             trust-constr methods as a sequence of ``(min, max)`` pairs for
             each element in x. None is used to specify no bound.
         options : dict, optional
-            Optimizer options, by default {'maxiter': budget}
+            Optimizer options, by default {'maxiter': budget}. For gradient
+            based methods, ``eps`` is the finite differences step, by default
+            the square root of the circuit precision.
         save_loss_progress : bool, optional
             Whether to store the loss progress, by default False
         save_output_progress : file path, optional
@@ -475,11 +566,24 @@ class Classifier():
         save_output_progress = kwargs.pop('save_output_progress', None)
         seed = kwargs.pop('seed', None)
 
+        # Minibatches are gathered from these at each evaluation, so we make
+        # them dense arrays once.
+        input_train = np.ascontiguousarray(input_train, dtype=float)
+        target_train = np.asarray(target_train)
+
         if seed is not None:
             np.random.seed(seed)
+        # Seeded from the global state, to be reproducible with np.random.seed
+        self.__rng = np.random.default_rng(
+            np.random.randint(2**32, dtype=np.uint32)
+        )
 
         _nbshots = self.nbshots
-        self.pbar = tqdm(total=self.__budget__, desc="Training", leave=False)
+        # Refresh at most once per second, as iterations can be very cheap
+        self.pbar = tqdm(
+            total=self.__budget__, desc="Training", leave=False,
+            mininterval=1.0, miniters=max(1, self.__budget__ // 100)
+        )
         self.__n_iter__ = 0
 
         if batch_size:
@@ -494,10 +598,8 @@ class Classifier():
                 {len(_labels)} in target_train"
             )
 
-        self.__indices = np.arange(len(target_train))
-        self.__rnd_indices = np.random.choice(
-            self.__indices, size=self.__batch_size, replace=False
-        )
+        self.__nbsamples = len(target_train)
+        self.__draw_batch__()
 
         if method.lower() in SCIPY_METHODS:
             self.__scipy_minimize__(
@@ -562,8 +664,15 @@ class Classifier():
         return out
 
     def save(self, path=None):
+        """Pickle the model information, as returned by :meth:`info_dict`.
+
+        Parameters
+        ----------
+        path : str, optional
+            Destination file, by default the classifier ``save_path``.
+        """
         if path is None:
             path = self.__save_path__
 
         with open(path, 'wb') as f:
-            pickle.dump(self.info_dict, f)
+            pickle.dump(self.info_dict(), f, protocol=pickle.HIGHEST_PROTOCOL)
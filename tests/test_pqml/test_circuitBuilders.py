@@ -2,6 +2,7 @@ import unittest
 
 import polyadicqml as pqml
 import numpy as np
+import manyq as mq
 
 def make_builder_test(builder_class):
 
@@ -56,6 +57,9 @@ def make_builder_test(builder_class):
                             a, b
                         )
 
+        def test_cz_allin_same_qubit_raises(self):
+            self.assertRaises(ValueError, self.bdr.cz_allin, 1, 1, [.3, .4])
+
     return BuilderTester
 
 
@@ -96,6 +100,40 @@ class TestMQBuilder(make_builder_test(pqml.manyq.mqBuilder)):
             repr(bdr2.circuit())
         )
 
+    def test_allin_state(self):
+        angles = np.random.randn(3, 4)
+        mq.initQreg(3, 4)
+        for idx, theta in enumerate(angles):
+            mq.SX(idx)
+            mq.RZ(idx, theta)
+            mq.SX(idx)
+        mq.CZ(0, 2)
+        expected = mq.measureAll().copy()
+
+        with self.subTest("allin"):
+            bdr = pqml.manyq.mqBuilder(3, 4)
+            bdr.allin(angles).cz(0, 2)
+            np.testing.assert_allclose(bdr(), expected)
+        with self.subTest("input"):
+            bdr = pqml.manyq.mqBuilder(3, 4)
+            for idx, theta in enumerate(angles):
+                bdr.input(idx, theta)
+            bdr.cz(0, 2)
+            np.testing.assert_allclose(bdr(), expected)
+        with self.subTest("input list"):
+            bdr = pqml.manyq.mqBuilder(3, 4)
+            bdr.input([2, 0], angles[[2, 0]]).input([1], angles[[1]])
+            bdr.cz(0, 2)
+            np.testing.assert_allclose(bdr(), expected)
+        with self.subTest("extra angles"):
+            bdr = pqml.manyq.mqBuilder(3, 4)
+            bdr.input([2, 0], angles[[2, 0, 1]]).input([1], angles[[1, 0]])
+            bdr.cz(0, 2)
+            np.testing.assert_allclose(bdr(), expected)
+            bdr = pqml.manyq.mqBuilder(3, 4)
+            bdr.allin(np.vstack((angles, angles))).cz(0, 2)
+            np.testing.assert_allclose(bdr(), expected)
+
     def test_cz(self):
         self.bdr.cz(1, 2)
         self.assertEqual(
@@ -103,5 +141,42 @@ class TestMQBuilder(make_builder_test(pqml.manyq.mqBuilder)):
             "CZ(1,2)"
         )
 
+    def test_cz_allin_state(self):
+        start, angles = np.random.randn(3, 4), np.random.randn(2, 4)
+        for a, b in [(0, 2), (2, 1)]:
+            with self.subTest(a=a, b=b):
+                bdr = pqml.manyq.mqBuilder(3, 4)
+                bdr.allin(start).cz(a, b).input([a, b], angles)
+                expected = bdr().copy()
+
+                bdr = pqml.manyq.mqBuilder(3, 4)
+                bdr.allin(start).cz_allin(a, b, angles)
+                np.testing.assert_allclose(bdr(), expected)
+
+        for angles in [[.3, -1.2, .7], [.3, -1.2, .7, 2.]]:
+            with self.subTest(angles=angles):
+                bdr = pqml.manyq.mqBuilder(3, 2)
+                bdr.cz_allin(0, 1, angles)
+                expected = bdr().copy()
+
+                bdr = pqml.manyq.mqBuilder(3, 2)
+                bdr.cz(0, 1).input([0, 1], angles)
+                np.testing.assert_allclose(expected, bdr())
+
+    def test_single_precision(self):
+        angles = np.random.randn(3, 4)
+        bdr = pqml.manyq.mqBuilder(3, 4)
+        expected = bdr.allin(angles).cz(0, 2).allin(angles)().copy()
+
+        bdr = pqml.manyq.mqBuilder(3, 4, dtype=np.complex64)
+        probas = bdr.allin(angles).cz(0, 2).allin(angles)()
+        self.assertEqual(probas.dtype, np.float32)
+        np.testing.assert_allclose(probas, expected, atol=1e-6)
+
+    def test_no_trace(self):
+        bdr = pqml.manyq.mqBuilder(3, 1, trace=False)
+        bdr.allin([1.5, 2.3, -1]).cz(1, 2)
+        self.assertEqual(str(bdr.circuit()), "")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+
+import polyadicqml as pqml
+import numpy as np
+
+
+def make_circuit(bdr, x, params):
+    bdr.allin(x[[0, 1]])
+
+    bdr.cz(0, 1)
+    bdr.allin(params[[0, 1]])
+
+    bdr.cz(0, 1)
+    bdr.allin(params[[2, 3]])
+
+    return bdr
+
+
+class TestMQCircuitML(unittest.TestCase):
+    def setUp(self):
+        self.qc = pqml.manyq.mqCircuitML(
+            make_circuit=make_circuit, nbqbits=2, nbparams=4
+        )
+        self.X = np.random.randn(5, 2)
+
+    def test_run_multiparams(self):
+        params = np.random.randn(3, 4)
+        out = self.qc.run_multiparams(self.X, params)
+
+        self.assertEqual(out.shape, (3, 5, 4))
+        for p, o in zip(params, out):
+            np.testing.assert_allclose(o, self.qc.run(self.X, p))
+
+    def test_job_size(self):
+        params = self.qc.random_params()
+        expected = self.qc.run(self.X, params)
+
+        for job_size in [1, 2, 5]:
+            with self.subTest(job_size=job_size):
+                np.testing.assert_allclose(
+                    self.qc.run(self.X, params, job_size=job_size), expected
+                )
+
+    def test_no_small_chunks(self):
+        def make_wide_circuit(bdr, x, params):
+            return bdr.allin(x).cz(0, 9).allin(params)
+
+        qc = pqml.manyq.mqCircuitML(
+            make_circuit=make_wide_circuit, nbqbits=10, nbparams=10
+        )
+        X = np.random.randn(300, 10)
+        with mock.patch.object(
+            qc, "__single_run__", wraps=qc.__single_run__
+        ) as single_run:
+            qc.run(X, qc.random_params())
+        single_run.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
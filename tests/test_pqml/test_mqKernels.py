@@ -0,0 +1,80 @@
+import unittest
+from unittest import mock
+
+import polyadicqml as pqml
+import numpy as np
+import manyq as mq
+
+from polyadicqml.manyq import mqKernels
+
+
+def mq_input(idx, theta):
+    mq.SX(idx)
+    mq.RZ(idx, theta)
+    mq.SX(idx)
+
+
+class TestMQKernels(unittest.TestCase):
+    def test_apply_2q(self):
+        cz = np.diag([1, 1, 1, -1])
+        h_sx = np.kron(mq.manyq.Hgate, mq.manyq.SXgate)
+        for a, b in [(0, 2), (2, 1)]:
+            with self.subTest(a=a, b=b):
+                mq.initQreg(3, 2)
+                mq.H(a)
+                mq.CZ(a, b)
+                mq.H(a)
+                mq.SX(b)
+                expected = mq.Qreg.inQ.copy()
+
+                mq.initQreg(3, 2)
+                mq.H(a)
+                mqKernels.apply_2q(a, b, cz)
+                mqKernels.apply_2q(a, b, h_sx)
+                np.testing.assert_allclose(mq.Qreg.inQ, expected, atol=1e-12)
+
+    def test_numpy_fallback(self):
+        start, angles = np.random.randn(3, 4), np.random.randn(2, 4)
+
+        mq.initQreg(3, 4)
+        for idx, theta in enumerate(start):
+            mq_input(idx, theta)
+        mq_input(1, angles[0])
+        mq.CZ(0, 2)
+        mq.CZ(2, 1)
+        mq_input(2, angles[0])
+        mq_input(1, angles[1])
+        expected = mq.measureAll().copy()
+
+        with mock.patch.object(mqKernels, "__numba_available__", False):
+            with self.subTest("gates"):
+                bdr = pqml.manyq.mqBuilder(3, 4)
+                bdr.allin(start).input(1, angles[0]).cz(0, 2)
+                bdr.cz(2, 1).input([2, 1], angles)
+                np.testing.assert_allclose(bdr(), expected, atol=1e-12)
+            with self.subTest("cz_allin"):
+                bdr = pqml.manyq.mqBuilder(3, 4)
+                bdr.allin(start).input(1, angles[0]).cz(0, 2)
+                bdr.cz_allin(2, 1, angles)
+                np.testing.assert_allclose(bdr(), expected, atol=1e-12)
+            with self.subTest("apply_2q"):
+                self.test_apply_2q()
+
+    def test_init_register_reuses_buffers(self):
+        mqKernels.init_register(3, 5)
+        mq.H(0)
+        buffers = {id(mq.Qreg.inQ.base), id(mq.Qreg.outQ.base)}
+
+        mqKernels.init_register(3, 2)
+        self.assertEqual(mq.Qreg.inQ.shape, (8, 2))
+        self.assertEqual(
+            {id(mq.Qreg.inQ.base), id(mq.Qreg.outQ.base)}, buffers
+        )
+
+        expected = np.zeros((8, 2))
+        expected[0] = 1
+        np.testing.assert_array_equal(mq.Qreg.inQ, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import polyadicqml as pqml
+import numpy as np
+
+
+def make_circuit(bdr, x, params):
+    bdr.allin(x[[0, 1]])
+
+    bdr.cz(0, 1)
+    bdr.allin(params[[0, 1]])
+
+    bdr.cz(0, 1)
+    bdr.allin(params[[2, 3]])
+
+    return bdr
+
+
+class TestClassifier(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(197)
+        n_pc = 100
+        self.X = np.asarray(
+            n_pc * [[1.5, 0.]] + n_pc * [[-1.5, 0.]] +
+            n_pc * [[0., -1.5]] + n_pc * [[0., 1.5]]
+        ) + .5 * rng.standard_normal((4 * n_pc, 2))
+        self.y = np.concatenate((np.zeros(2*n_pc), np.ones(2*n_pc)))
+
+        self.qc = pqml.manyq.mqCircuitML(
+            make_circuit=make_circuit, nbqbits=2, nbparams=4
+        )
+
+    def make_model(self, seed, budget):
+        return pqml.Classifier(
+            self.qc, [0, 1], budget=budget,
+            params=self.qc.random_params(seed)
+        )
+
+    def test_minibatch_bfgs(self):
+        for seed in range(1, 4):
+            with self.subTest(seed=seed):
+                model = self.make_model(seed, budget=50)
+                model.fit(self.X, self.y, batch_size=100, seed=seed)
+                self.assertGreater(model.__n_iter__, 5)
+
+    def test_minibatch_derivative_free(self):
+        for method in ["Nelder-Mead", "COBYLA"]:
+            for seed in range(1, 4):
+                with self.subTest(method=method, seed=seed):
+                    model = self.make_model(seed, budget=100)
+                    model.fit(
+                        self.X, self.y, batch_size=100, seed=seed,
+                        method=method
+                    )
+                    self.assertGreater(
+                        np.mean(model.predict(self.X) == self.y), .8
+                    )
+
+    def test_single_precision(self):
+        qc = pqml.manyq.mqCircuitML(
+            make_circuit=make_circuit, nbqbits=2, nbparams=4,
+            dtype=np.complex64
+        )
+        for seed in range(1, 4):
+            with self.subTest(seed=seed):
+                model = pqml.Classifier(
+                    qc, [0, 1], budget=50, params=qc.random_params(seed)
+                )
+                model.fit(self.X, self.y, seed=seed)
+                self.assertGreater(
+                    np.mean(model.predict(self.X) == self.y), .8
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+from sklearn.metrics import log_loss
+
+from polyadicqml.utility import CE_loss, stable_softmax
+
+
+class TestCELoss(unittest.TestCase):
+    def test_matches_log_loss(self):
+        y_pred = np.random.rand(20, 3)
+        y_true = np.random.randint(3, size=20)
+        y_true[:3] = [0, 1, 2]
+
+        for labels in [None, [0, 1, 2], np.array([2, 0, 1])]:
+            with self.subTest(labels=labels):
+                self.assertAlmostEqual(
+                    CE_loss(y_true, y_pred, labels=labels),
+                    log_loss(
+                        y_true, stable_softmax(y_pred, axis=1), labels=labels
+                    )
+                )
+
+    def test_unknown_label_raises(self):
+        y_pred = np.random.rand(4, 2)
+        self.assertRaises(
+            ValueError, CE_loss, [0, 1, 2, 1], y_pred, labels=[0, 1]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()